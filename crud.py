@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 import models, schemas
 import json
 from typing import Optional, List
@@ -231,3 +232,57 @@ def create_message(db: Session, message: schemas.MessageCreate):
     db.commit()
     db.refresh(db_message)
     return db_message
+
+# StoredFile operations
+def get_stored_file(db: Session, file_id: str):
+    return db.query(models.StoredFile).filter(models.StoredFile.id == file_id).first()
+
+def get_stored_files(db: Session, file_ids: List[str]):
+    return db.query(models.StoredFile).filter(models.StoredFile.id.in_(file_ids)).all()
+
+def create_stored_file(db: Session, file_id: str, size: int, content_type: str, filename: Optional[str] = None):
+    # Content is deduplicated by hash, so the same upload maps to the same row
+    db_file = get_stored_file(db, file_id=file_id)
+    if db_file:
+        return db_file
+    db_file = models.StoredFile(
+        id=file_id,
+        filename=filename,
+        content_type=content_type,
+        size=size
+    )
+    db.add(db_file)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored the same content first
+        db.rollback()
+        return get_stored_file(db, file_id=file_id)
+    db.refresh(db_file)
+    return db_file
+
+def load_file_ids(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    file_ids = json.loads(value)
+    if not isinstance(file_ids, list) or not all(isinstance(file_id, str) for file_id in file_ids):
+        raise ValueError("Expected a JSON list of file ids")
+    return file_ids
+
+def add_assignment_attachment(db: Session, db_assignment: models.Assignment, file_id: str):
+    file_ids = load_file_ids(db_assignment.attachments)
+    if file_id not in file_ids:
+        file_ids.append(file_id)
+        db_assignment.attachments = json.dumps(file_ids)
+        db.commit()
+        db.refresh(db_assignment)
+    return db_assignment
+
+def add_lecture_material(db: Session, db_lecture: models.Lecture, file_id: str):
+    file_ids = load_file_ids(db_lecture.materials)
+    if file_id not in file_ids:
+        file_ids.append(file_id)
+        db_lecture.materials = json.dumps(file_ids)
+        db.commit()
+        db.refresh(db_lecture)
+    return db_lecture
@@ -1,8 +1,8 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, File, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import models, schemas, crud
+import models, schemas, crud, storage
 from database import engine, get_db
 
 models.Base.metadata.create_all(bind=engine)
@@ -16,8 +16,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Accept-Ranges", "Content-Range", "Content-Disposition", "ETag"],
 )
 
+def check_file_references(db: Session, value: Optional[str]):
+    try:
+        file_ids = crud.load_file_ids(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="File references must be a JSON list of file ids")
+    if len(crud.get_stored_files(db, file_ids=file_ids)) != len(set(file_ids)):
+        raise HTTPException(status_code=400, detail="Unknown file reference")
+
+def store_upload(db: Session, upload: UploadFile):
+    try:
+        file_id, size = storage.save_upload(upload.file)
+    except storage.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File too large")
+    return crud.create_stored_file(
+        db,
+        file_id=file_id,
+        size=size,
+        content_type=upload.content_type or "application/octet-stream",
+        filename=upload.filename
+    )
+
 @app.get("/")
 def read_root():
     return {"message": "University Management API is running"}
@@ -45,6 +67,7 @@ def read_user(user_id: str, db: Session = Depends(get_db)):
 # Assignment endpoints
 @app.post("/assignments/", response_model=schemas.Assignment)
 def create_assignment(assignment: schemas.AssignmentCreate, db: Session = Depends(get_db)):
+    check_file_references(db, assignment.attachments)
     return crud.create_assignment(db=db, assignment=assignment)
 
 @app.get("/assignments/", response_model=List[schemas.Assignment])
@@ -65,9 +88,21 @@ def read_assignment(assignment_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Assignment not found")
     return db_assignment
 
+@app.post("/assignments/{assignment_id}/attachments", response_model=schemas.Assignment)
+def upload_assignment_attachment(assignment_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    db_assignment = crud.get_assignment(db, assignment_id=assignment_id)
+    if db_assignment is None:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    db_file = store_upload(db, file)
+    try:
+        return crud.add_assignment_attachment(db, db_assignment=db_assignment, file_id=db_file.id)
+    except ValueError:
+        raise HTTPException(status_code=409, detail="Existing attachments are not a JSON list of file ids")
+
 # Lecture endpoints
 @app.post("/lectures/", response_model=schemas.Lecture)
 def create_lecture(lecture: schemas.LectureCreate, db: Session = Depends(get_db)):
+    check_file_references(db, lecture.materials)
     return crud.create_lecture(db=db, lecture=lecture)
 
 @app.get("/lectures/", response_model=List[schemas.Lecture])
@@ -82,6 +117,17 @@ def read_lectures(
     lectures = crud.get_lectures(db, skip=skip, limit=limit, department=department, semester=semester, date=date)
     return lectures
 
+@app.post("/lectures/{lecture_id}/materials", response_model=schemas.Lecture)
+def upload_lecture_material(lecture_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    db_lecture = crud.get_lecture(db, lecture_id=lecture_id)
+    if db_lecture is None:
+        raise HTTPException(status_code=404, detail="Lecture not found")
+    db_file = store_upload(db, file)
+    try:
+        return crud.add_lecture_material(db, db_lecture=db_lecture, file_id=db_file.id)
+    except ValueError:
+        raise HTTPException(status_code=409, detail="Existing materials are not a JSON list of file ids")
+
 # Subject endpoints
 @app.post("/subjects/", response_model=schemas.Subject)
 def create_subject(subject: schemas.SubjectCreate, db: Session = Depends(get_db)):
@@ -148,3 +194,35 @@ def create_message(message: schemas.MessageCreate, db: Session = Depends(get_db)
 def read_messages(chat_group_id: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     messages = crud.get_messages(db, chat_group_id=chat_group_id, skip=skip, limit=limit)
     return messages
+
+# File endpoints
+@app.post("/files/", response_model=schemas.StoredFile)
+def upload_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return store_upload(db, file)
+
+@app.api_route("/files/{file_id}", methods=["GET", "HEAD"])
+def download_file(file_id: str, request: Request, db: Session = Depends(get_db)):
+    db_file = crud.get_stored_file(db, file_id=file_id)
+    if db_file is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # The id is the content hash, so it doubles as a strong ETag
+    etag = f'"{db_file.id}"'
+    headers = {"etag": etag, "cache-control": storage.CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+
+    return storage.BlobResponse(
+        storage.blob_path(db_file.id),
+        size=db_file.size,
+        media_type=db_file.content_type,
+        filename=db_file.filename,
+        headers=headers,
+        range_header=range_header
+    )
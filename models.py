@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Integer, String, Text, DateTime
 from sqlalchemy.orm import relationship
 import datetime
 import uuid
@@ -53,7 +53,7 @@ class Assignment(Base):
     department = Column(String)
     subject = Column(String)
     author_id = Column(String, ForeignKey("users.id"))
-    attachments = Column(String, nullable=True)  # JSON string of file paths
+    attachments = Column(String, nullable=True)  # JSON string of stored file ids
     semester = Column(String)
 
     # Relationships
@@ -72,7 +72,7 @@ class Lecture(Base):
     department = Column(String)
     subject = Column(String)
     professor_id = Column(String, ForeignKey("users.id"))
-    materials = Column(String, nullable=True)  # JSON string of file paths
+    materials = Column(String, nullable=True)  # JSON string of stored file ids
     semester = Column(String)
 
     # Relationships
@@ -120,3 +120,12 @@ class Message(Base):
     # Relationships
     sender = relationship("User", back_populates="messages")
     chat_group = relationship("ChatGroup", back_populates="messages")
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+
+    id = Column(String, primary_key=True)  # SHA-256 of the content
+    filename = Column(String)
+    content_type = Column(String)
+    size = Column(BigInteger)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -136,3 +136,14 @@ class Message(MessageBase):
 
     class Config:
         orm_mode = True
+
+# StoredFile schemas
+class StoredFile(BaseModel):
+    id: str
+    filename: Optional[str] = None
+    content_type: str
+    size: int
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+import anyio
+from dotenv import load_dotenv
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+load_dotenv()
+
+# Uploaded files are stored once per distinct content, named by their SHA-256
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))
+CHUNK_SIZE = 1024 * 1024
+
+# Blobs never change once written, so clients may cache them indefinitely
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_FILE_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def is_file_id(value: str) -> bool:
+    return bool(_FILE_ID_RE.match(value))
+
+
+def blob_path(file_id: str) -> str:
+    if not is_file_id(file_id):
+        raise ValueError(f"Invalid file id: {file_id!r}")
+    return os.path.join(UPLOAD_DIR, file_id[:2], file_id)
+
+
+def save_upload(source: BinaryIO) -> Tuple[str, int]:
+    """Stream an upload to disk chunk by chunk and return its (file id, size).
+
+    Identical content is only kept once: if a blob with the same hash already
+    exists, the freshly written copy is discarded.
+    """
+    tmp_dir = os.path.join(UPLOAD_DIR, ".tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+
+        file_id = digest.hexdigest()
+        path = blob_path(file_id)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return file_id, size
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` range into inclusive (start, end) offsets.
+
+    Returns None when the header should be ignored (other units, multiple
+    ranges, malformed values) and raises ValueError when it is unsatisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+class BlobResponse(FileResponse):
+    """FileResponse for stored blobs that also answers single-range requests.
+
+    The body is sent with the ASGI zero-copy extension when the server offers
+    it. Otherwise full responses fall back to Starlette's own path (including
+    pathsend) and partial ones read just the requested slice.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        media_type: str,
+        filename: Optional[str] = None,
+        headers: Optional[dict] = None,
+        range_header: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, headers=headers, media_type=media_type, filename=filename)
+        self.headers["accept-ranges"] = "bytes"
+
+        try:
+            byte_range = parse_range(range_header, size) if range_header else None
+        except ValueError:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            self.offset, self.count = 0, 0
+            return
+
+        if byte_range is None:
+            self.offset, self.count = 0, size
+        else:
+            start, end = byte_range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.offset, self.count = start, end - start + 1
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        if self.status_code == 200 and not zerocopy:
+            await super().__call__(scope, receive, send)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.count == 0 or scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif zerocopy:
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+        else:
+            remaining = self.count
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": remaining > 0,
+                        }
+                    )
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()